@@ -13,11 +13,15 @@ class GraphAstar(Algorithm):
         expand_counter = 0
         roots = [Node(s) for s in self.problem.get_start_states()]
 
+        # Los problemas pueden agrupar estados equivalentes (p. ej. simetrías)
+        # bajo una misma clave para la detección de duplicados
+        key = getattr(self.problem, "canonical_state", lambda s: s)
+
         cost_so_far = {}
         for n in roots:
             f_n = n.cost + self.problem.heuristic(n.state)
             self.fringe.push(n, f_n)
-            cost_so_far[n.state] = n.cost
+            cost_so_far[key(n.state)] = n.cost
 
         while not self.fringe.is_empty():
             n = self.fringe.pop()
@@ -34,10 +38,11 @@ class GraphAstar(Algorithm):
                 new_cost = n.cost + c
 
                 # Solo expandir si no se conoce o se mejora el coste
-                if s not in cost_so_far or new_cost < cost_so_far[s]:
+                k = key(s)
+                if k not in cost_so_far or new_cost < cost_so_far[k]:
                     ns = Node(s, a, cost=new_cost, parent=n)
                     n.add_successor(ns)
-                    cost_so_far[s] = new_cost
+                    cost_so_far[k] = new_cost
 
                     f_ns = new_cost + self.problem.heuristic(s)
                     self.fringe.push(ns, f_ns)
@@ -0,0 +1,123 @@
+from hlogedu.search.algorithm import Algorithm, Node, Solution
+
+
+class FrontierBfs(Algorithm):
+    """Breadth-first frontier search with divide-and-conquer path recovery.
+
+    Only valid for problems with unit costs and reversible actions (an
+    undirected state graph, e.g. PacmanProblem): every successor of the
+    current layer is then either in the previous, the current or the next
+    layer, so closed states can be dropped and memory is proportional to
+    the frontier width. States are handled through the problem's
+    `encode_state`/`decode_state` when it defines them (compact ints).
+
+    The path is recovered recursively from a split state on it. The first
+    search does not know the goal depth `d` in advance, so each state
+    remembers its ancestors at the last two power-of-two layers `L // 2`
+    and `L`; the one closer to `d / 2` splits the path between 1/3 and 2/3
+    of its length. Deeper searches know their depth and split exactly at
+    layer `d // 2`.
+    """
+
+    NAME = "my-frontier-bfs"
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.encode = getattr(problem, "encode_state", lambda s: s)
+        self.decode = getattr(problem, "decode_state", lambda s: s)
+        self.expand_counter = 0
+
+    def run(self):
+        roots = [Node(s) for s in self.problem.get_start_states()]
+        sources = [self.encode(n.state) for n in roots]
+
+        def is_goal(e):
+            return self.problem.is_goal_state(self.decode(e))
+
+        def relay(depth, e, tag):
+            # tag = (raíz, ancestro en la capa L // 2, ancestro en la capa L)
+            if depth & (depth - 1) == 0:
+                return tag[0], tag[2], e
+            return tag
+
+        # Primera búsqueda: profundidad del objetivo, raíz y punto de corte
+        result = self._search(sources, is_goal, lambda e: (e, e, e), relay)
+        if result is None:
+            return Solution(self.problem, roots)
+
+        depth, target, (source, low, high) = result
+        if depth < 2:
+            path = self._path(source, target, depth)
+        else:
+            top = 1 << (depth.bit_length() - 1)
+            if abs(top - depth / 2) <= abs(top // 2 - depth / 2):
+                split, mid = top, high
+            else:
+                split, mid = top // 2, low
+            path = self._path(source, mid, split)[:-1] + self._path(mid, target, depth - split)
+
+        # Reconstruir la cadena de nodos desde la raíz correspondiente. El
+        # contador sigue el de las búsquedas, así que el último nodo expandido
+        # lleva el número total de expansiones
+        n = roots[sources.index(source)]
+        for e in path[1:]:
+            self.expand_counter += 1
+            n.expand_order = self.expand_counter
+            n.location = Node.Location.EXPANDED
+            for s, a, c in sorted(self.problem.get_successors(n.state), key=lambda x: x[0]):
+                if self.encode(s) == e:
+                    ns = Node(s, a, cost=n.cost + c, parent=n)
+                    n.add_successor(ns)
+                    n = ns
+                    break
+        return Solution(self.problem, roots, solution_node=n)
+
+    def _path(self, source, target, depth):
+        """Encoded states of a shortest path of length `depth`."""
+        if depth == 0:
+            return [source]
+        if depth == 1:
+            return [source, target]
+
+        half = depth // 2
+
+        def mark(d, e, tag):
+            return e if d == half else tag
+
+        _, _, mid = self._search([source], lambda e: e == target, lambda e: None, mark)
+        return self._path(source, mid, half)[:-1] + self._path(mid, target, depth - half)
+
+    def _search(self, sources, is_target, source_tag, next_tag):
+        """Layered BFS from `sources` until a state satisfying `is_target`.
+
+        Sources are tagged with `source_tag(e)` and every new state at
+        depth `d` with `next_tag(d, e, parent_tag)`. Returns
+        `(depth, target, tag)` or None if no target is reachable.
+        """
+        previous = {}
+        current = {e: source_tag(e) for e in sources}
+        for e, tag in current.items():
+            if is_target(e):
+                return 0, e, tag
+
+        depth = 0
+        while current:
+            following = {}
+            for e, tag in current.items():
+                self.expand_counter += 1
+                for s, _, c in self.problem.get_successors(self.decode(e)):
+                    if c != 1:
+                        raise ValueError(f"{self.NAME} only supports unit-cost problems")
+                    k = self.encode(s)
+                    if k in previous or k in current or k in following:
+                        continue
+                    following[k] = next_tag(depth + 1, k, tag)
+                    if is_target(k):
+                        return depth + 1, k, following[k]
+
+            # Frontier search: the closed states behind `previous` are dropped
+            previous, current = current, following
+            depth += 1
+
+        # No se ha encontrado solución
+        return None
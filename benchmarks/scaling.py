@@ -0,0 +1,239 @@
+"""Scaling benchmark of the search algorithms.
+
+Runs every algorithm on families of generated instances of growing size
+and records, for each run, the number of expansions, the wall time and
+the peak memory (as seen by `tracemalloc`). Tracing slows algorithms down
+unevenly, so time and memory are measured in two separate runs on fresh
+instances. Only runs that found a solution are plotted. Results are written to a CSV
+file and, if matplotlib is installed, plotted against instance size.
+
+Run from the repository root:
+
+    python -m benchmarks.scaling --family pacman --sizes 16 32 64 128
+    python -m benchmarks.scaling --family nqueens --sizes 4 5 6 7 8
+    python -m benchmarks.scaling --family kiwis --sizes 1 2 3 4
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from algorithms.astar_graph import GraphAstar
+from algorithms.astar_tree import TreeAstar
+from algorithms.bfs_frontier import FrontierBfs
+from algorithms.ids import TreeIds
+from problems.generators import GENERATORS, generate_layout, write_layout
+from problems.kiwis_and_dogs import KiwisAndDogsProblem, PatternDatabaseHeuristic
+from problems.nqueens import MostConstrainedHeuristic, NQueensIterativeRepair
+from problems.pacman import ManhattanHeuristic, PacmanProblem
+
+ALGORITHMS = [GraphAstar, TreeAstar, TreeIds]
+# Only for unit-cost problems with reversible actions
+UNIT_COST_ALGORITHMS = [FrontierBfs]
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+# Instance families: size -> (problem, heuristic)
+##############################################################################
+
+
+def pacman_instance(size, seed, kind, workdir):
+    path = os.path.join(workdir, f"{kind}-{size}-{seed}.lay")
+    if not os.path.exists(path):
+        write_layout(generate_layout(kind, size, size, seed), path)
+    problem = PacmanProblem(path)
+    return problem, ManhattanHeuristic(problem)
+
+
+def nqueens_instance(size, seed, *_):
+    problem = NQueensIterativeRepair(n_queens=size, seed=seed)
+    return problem, MostConstrainedHeuristic(problem)
+
+
+def kiwis_instance(size, seed, _, workdir):
+    # `size` is the number of agents: `size` kiwis and one dog
+    pdb_file = os.path.join(workdir, f"kiwis-{size}-{seed}.npz")
+    problem = KiwisAndDogsProblem(
+        num_kiwis=size, num_dogs=1, num_vertices=10, seed=seed, pdb_file=pdb_file
+    )
+    # Build (first time) or load the tables outside the measured runs
+    heuristic = PatternDatabaseHeuristic(problem)
+    heuristic.pdb = PatternDatabaseHeuristic.load_or_build(problem)
+    return problem, heuristic
+
+
+FAMILIES = {
+    "pacman": pacman_instance,
+    "nqueens": nqueens_instance,
+    "kiwis": kiwis_instance,
+}
+
+
+# Measurement
+##############################################################################
+
+
+def instrument(problem, heuristic, max_expansions):
+    """Count expansions on `problem` (calls to `get_successors`) and fix
+    its heuristic. Returns the expansion counter."""
+    counter = {"expansions": 0}
+    get_successors = problem.get_successors
+
+    def counting_get_successors(state):
+        counter["expansions"] += 1
+        if counter["expansions"] > max_expansions:
+            raise BudgetExceeded
+        return get_successors(state)
+
+    problem.get_successors = counting_get_successors
+    problem.heuristic = heuristic.compute
+    return counter
+
+
+def run_algorithm(algorithm_cls, problem):
+    """Returns whether the run finished within the budget and whether it
+    found a solution."""
+    try:
+        solution = algorithm_cls(problem).run()
+    except BudgetExceeded:
+        return False, False
+    return True, solution.solution_node is not None
+
+
+def run_once(algorithm_cls, make_instance, max_expansions):
+    """Time an untraced run, then measure peak memory on a fresh instance."""
+    problem, heuristic = make_instance()
+    counter = instrument(problem, heuristic, max_expansions)
+    start = time.perf_counter()
+    finished, solved = run_algorithm(algorithm_cls, problem)
+    elapsed = time.perf_counter() - start
+
+    problem, heuristic = make_instance()
+    instrument(problem, heuristic, max_expansions)
+    tracemalloc.start()
+    try:
+        run_algorithm(algorithm_cls, problem)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "expansions": counter["expansions"],
+        "time": elapsed,
+        "memory": peak,
+        "finished": finished,
+        "solved": solved,
+        "error": "",
+    }
+
+
+def failed_run(error):
+    return {
+        "expansions": None,
+        "time": None,
+        "memory": None,
+        "finished": False,
+        "solved": False,
+        "error": str(error),
+    }
+
+
+def benchmark(family, sizes, seeds, max_expansions, kind, workdir):
+    algorithms = ALGORITHMS + (UNIT_COST_ALGORITHMS if family == "pacman" else [])
+    rows = []
+    for size in sizes:
+        for seed in seeds:
+            for algorithm_cls in algorithms:
+                # A bad instance or run is recorded and the sweep goes on
+                def make_instance():
+                    return FAMILIES[family](size, seed, kind, workdir)
+
+                try:
+                    result = run_once(algorithm_cls, make_instance, max_expansions)
+                except ValueError as e:
+                    result = failed_run(e)
+                row = {"algorithm": algorithm_cls.NAME, "size": size, "seed": seed, **result}
+                rows.append(row)
+                if row["error"]:
+                    print(f"{row['algorithm']:>15} size={size:<5} seed={seed:<4} failed: {row['error']}")
+                    continue
+                print(
+                    f"{row['algorithm']:>15} size={size:<5} seed={seed:<4} "
+                    f"expansions={row['expansions']:<9} time={row['time']:.3f}s "
+                    f"memory={row['memory'] / 2**20:.1f}MiB"
+                    + ("" if row["finished"] else " (budget exceeded)")
+                    + (" (no solution)" if row["finished"] and not row["solved"] else "")
+                )
+    return rows
+
+
+# Output
+##############################################################################
+
+
+def write_csv(rows, path):
+    with open(path, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def plot(rows, family, path):
+    """Plot expansions, time and memory (mean over seeds) against size."""
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed: skipping the plot")
+        return
+
+    metrics = [("expansions", "Expansions"), ("time", "Time (s)"), ("memory", "Peak memory (bytes)")]
+    fig, axes = plt.subplots(1, len(metrics), figsize=(5 * len(metrics), 4))
+    for ax, (metric, label) in zip(axes, metrics):
+        for name in dict.fromkeys(r["algorithm"] for r in rows):
+            by_size = {}
+            for r in rows:
+                if r["algorithm"] == name and r["solved"]:
+                    by_size.setdefault(r["size"], []).append(r[metric])
+            sizes = sorted(by_size)
+            ax.plot(sizes, [sum(by_size[s]) / len(by_size[s]) for s in sizes], marker="o", label=name)
+        ax.set_xlabel("Instance size")
+        ax.set_ylabel(label)
+        ax.set_yscale("log")
+        ax.legend()
+    fig.suptitle(f"Scaling on {family}")
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the search algorithms.")
+    parser.add_argument("--family", choices=sorted(FAMILIES), default="pacman")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[123456])
+    parser.add_argument(
+        "--kind",
+        choices=sorted(GENERATORS),
+        default="perfect",
+        help="Layout generator (pacman only).",
+    )
+    parser.add_argument("--max-expansions", type=int, default=1_000_000)
+    parser.add_argument("--output", default="scaling", help="Prefix of the .csv/.png files.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        rows = benchmark(args.family, args.sizes, args.seeds, args.max_expansions, args.kind, workdir)
+    write_csv(rows, f"{args.output}.csv")
+    plot(rows, args.family, f"{args.output}.png")
+
+
+if __name__ == "__main__":
+    main()
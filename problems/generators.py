@@ -0,0 +1,197 @@
+"""Seeded generators of Pacman layouts for scalability testing.
+
+Layouts use the Pacman Project `.lay` format read by `PacmanProblem`:
+`%` walls, `P` Pacman start and `.` the food. Every generated layout is
+surrounded by walls and its food is always reachable from Pacman.
+
+Example:
+
+    python -m problems.generators perfect 1024 1024 --seed 7 -o maze.lay
+"""
+
+import argparse
+import random
+from collections import deque
+
+WALL = ord("%")
+FREE = ord(" ")
+
+MAX_SIZE = 4096
+
+
+def _empty_grid(rows, cols, fill):
+    if not (3 <= rows <= MAX_SIZE and 3 <= cols <= MAX_SIZE):
+        raise ValueError(f"Layout size must be between 3 and {MAX_SIZE}")
+    return [bytearray([fill]) * cols for _ in range(rows)]
+
+
+def _add_border(grid):
+    rows, cols = len(grid), len(grid[0])
+    grid[0][:] = bytearray([WALL]) * cols
+    grid[-1][:] = bytearray([WALL]) * cols
+    for r in range(rows):
+        grid[r][0] = grid[r][-1] = WALL
+
+
+def perfect_maze(rows, cols, rng):
+    """Maze with exactly one path between any two cells (randomized DFS)."""
+    grid = _empty_grid(rows, cols, WALL)
+    # Cells live on odd coordinates; walls between them are carved.
+    cell_rows, cell_cols = (rows - 1) // 2, (cols - 1) // 2
+    stack = [(0, 0)]
+    grid[1][1] = FREE
+    while stack:
+        r, c = stack[-1]
+        neighbours = [
+            (r + dr, c + dc)
+            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+            if 0 <= r + dr < cell_rows
+            and 0 <= c + dc < cell_cols
+            and grid[2 * (r + dr) + 1][2 * (c + dc) + 1] == WALL
+        ]
+        if not neighbours:
+            stack.pop()
+            continue
+        nr, nc = rng.choice(neighbours)
+        grid[r + nr + 1][c + nc + 1] = FREE
+        grid[2 * nr + 1][2 * nc + 1] = FREE
+        stack.append((nr, nc))
+    return grid
+
+
+def random_maze(rows, cols, rng, density=0.3):
+    """Grid where each inner cell is a wall with probability `density`."""
+    grid = _empty_grid(rows, cols, FREE)
+    for row in grid:
+        for c in range(cols):
+            if rng.random() < density:
+                row[c] = WALL
+    _add_border(grid)
+    return grid
+
+
+def open_rooms(rows, cols, rng, room_size=16):
+    """Open rooms of about `room_size` cells a side joined by doors."""
+    grid = _empty_grid(rows, cols, FREE)
+    _add_border(grid)
+    step = room_size + 1
+    for r in range(step, rows - 1, step):
+        grid[r][1:-1] = bytearray([WALL]) * (cols - 2)
+    for c in range(step, cols - 1, step):
+        for r in range(1, rows - 1):
+            grid[r][c] = WALL
+
+    # One door on every inner wall segment of every room
+    for r in range(step, rows - 1, step):
+        for c in range(0, cols - 1, step):
+            hi = min(c + step, cols - 1)
+            if hi - c > 1:
+                grid[r][rng.randrange(c + 1, hi)] = FREE
+    for c in range(step, cols - 1, step):
+        for r in range(0, rows - 1, step):
+            hi = min(r + step, rows - 1)
+            if hi - r > 1:
+                grid[rng.randrange(r + 1, hi)][c] = FREE
+    return grid
+
+
+_FREE_TABLE = bytes(1 if b == FREE else 0 for b in range(256))
+
+
+def _free_mask(row):
+    """Row as an int with one non-zero byte per free cell."""
+    return int.from_bytes(row.translate(_FREE_TABLE), "big")
+
+
+def _has_free_pair(grid):
+    """Whether two free cells are adjacent anywhere in the grid."""
+    masks = [_free_mask(row) for row in grid]
+    return any(m & (m >> 8) for m in masks) or any(
+        a & b for a, b in zip(masks, masks[1:])
+    )
+
+
+def _random_free_cell(grid, rng, free):
+    """Flat index of a uniformly random free cell."""
+    cols = len(grid[0])
+    k = rng.randrange(free)
+    for r, row in enumerate(grid):
+        count = row.count(FREE)
+        if k < count:
+            c = -1
+            for _ in range(k + 1):
+                c = row.index(FREE, c + 1)
+            return r * cols + c
+        k -= count
+
+
+def place_pacman_and_food(grid, rng):
+    """Put `P` on a random free cell with a free neighbour and `.` on a
+    random cell reachable from it. Raises ValueError if the layout has no
+    room for both."""
+    rows, cols = len(grid), len(grid[0])
+    free = sum(row.count(FREE) for row in grid)
+    if not _has_free_pair(grid):
+        raise ValueError("Layout has no two adjacent free cells")
+
+    # Redraw until the start is not walled in on all four sides
+    while True:
+        start = _random_free_cell(grid, rng, free)
+        r, c = divmod(start, cols)
+        if FREE in (grid[r - 1][c], grid[r + 1][c], grid[r][c - 1], grid[r][c + 1]):
+            break
+
+    # BFS over flat indices; reservoir sampling picks the food uniformly
+    # among the reachable cells without storing them.
+    seen = bytearray(rows * cols)
+    seen[start] = 1
+    queue = deque([start])
+    food, reached = None, 0
+    while queue:
+        i = queue.popleft()
+        for j in (i - cols, i + cols, i - 1, i + 1):
+            if not seen[j] and grid[j // cols][j % cols] == FREE:
+                seen[j] = 1
+                queue.append(j)
+                reached += 1
+                if rng.randrange(reached) == 0:
+                    food = j
+
+    grid[start // cols][start % cols] = ord("P")
+    grid[food // cols][food % cols] = ord(".")
+    return grid
+
+
+GENERATORS = {
+    "perfect": perfect_maze,
+    "random": random_maze,
+    "rooms": open_rooms,
+}
+
+
+def generate_layout(kind, rows, cols, seed):
+    """Generate a layout of the given `kind` as a list of strings."""
+    rng = random.Random(seed)
+    grid = GENERATORS[kind](rows, cols, rng)
+    place_pacman_and_food(grid, rng)
+    return [row.decode("ascii") for row in grid]
+
+
+def write_layout(layout, path):
+    with open(path, "w") as fh:
+        fh.write("\n".join(layout) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a Pacman layout.")
+    parser.add_argument("kind", choices=sorted(GENERATORS))
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("--seed", type=int, default=123456)
+    parser.add_argument("-o", "--output", required=True, help="Output .lay file.")
+    args = parser.parse_args()
+    write_layout(generate_layout(args.kind, args.rows, args.cols, args.seed), args.output)
+
+
+if __name__ == "__main__":
+    main()
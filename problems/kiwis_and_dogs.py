@@ -1,5 +1,12 @@
+import heapq
+import itertools
+import os
+import random
 from dataclasses import dataclass
 
+import numpy as np
+
+from hlogedu.search.common import ClassParameter
 from hlogedu.search.problem import Problem, action, DDRange, Heuristic, DynamicCategorical as DCategorical
 
 @action(DDRange(0, 'num_kiwis'), DCategorical('vertices'))
@@ -19,9 +26,50 @@ class State:
 
 class KiwisAndDogsProblem(Problem):
     NAME = "kiwis-and-dogs"
+    PARAMS = [
+        ClassParameter(name="num_kiwis", type=int, default="2", help="Number of kiwis."),
+        ClassParameter(name="num_dogs", type=int, default="1", help="Number of dogs."),
+        ClassParameter(
+            name="num_vertices",
+            type=int,
+            default="0",
+            help="Vertices of a random graph (0 uses the fixed 7-vertex graph).",
+        ),
+        ClassParameter(name="seed", type=int, default="123456", help="Random seed."),
+        ClassParameter(
+            name="pdb_file",
+            type=str,
+            default=None,
+            help="Pattern database file (.npz), built and saved if missing.",
+        ),
+    ]
 
-    def __init__(self):
+    def __init__(
+        self,
+        num_kiwis: int = 2,
+        num_dogs: int = 1,
+        num_vertices: int = 0,
+        seed: int = 123456,
+        pdb_file: str = None,
+    ):
         super().__init__()
+        self.num_kiwis = num_kiwis
+        self.num_dogs = num_dogs
+        self.seed = seed
+        self.pdb_file = pdb_file
+        rng = random.Random(seed)
+
+        if num_vertices < 0 or num_vertices == 1:
+            raise ValueError("num_vertices must be 0 (fixed graph) or at least 2")
+        if num_vertices:
+            self.graph = random_graph(num_vertices, rng)
+            self.vertices = sorted({v for edge in self.graph for v in edge}, key=vertex_key)
+            self.vertex_index = {v: i for i, v in enumerate(self.vertices)}
+            self.kiwi_goal = self.vertices[0]
+            self.dog_goal = self.vertices[-1]
+            self.start_state = self._random_start(rng)
+            return
+
         # Assume we only have `nobody(X)` and `somebody(X)` conditions.
         # In case of having more than one condition, these will always be
         # a conjunction and will be separated by a comma.
@@ -49,18 +97,31 @@ class KiwisAndDogsProblem(Problem):
             ("G", "F"): (7, ""),
             ("G", "B"): (5, ""),
         }
-        self.num_kiwis = 2
-        self.num_dogs = 1
+        self.kiwi_goal = "A"
+        self.dog_goal = "E"
         self.vertices = sorted({v for edge in self.graph for v in edge})
+        self.vertex_index = {v: i for i, v in enumerate(self.vertices)}
+        if (num_kiwis, num_dogs) == (2, 1):
+            self.start_state = State(kiwis=("D", "F"), dogs=("C",))
+        else:
+            self.start_state = self._random_start(rng)
+
+    def _random_start(self, rng):
+        return State(
+            kiwis=tuple(rng.choice(self.vertices) for _ in range(self.num_kiwis)),
+            dogs=tuple(rng.choice(self.vertices) for _ in range(self.num_dogs)),
+        )
 
     def get_start_states(self):
-        return [State(kiwis=("D", "F"), dogs=("C",))]
+        return [self.start_state]
 
     def is_goal_state(self, state):
-        return all(k == "A" for k in state.kiwis) and all(d == "E" for d in state.dogs)
+        return all(k == self.kiwi_goal for k in state.kiwis) and all(
+            d == self.dog_goal for d in state.dogs
+        )
 
     def is_valid_state(self, state):
-        valid_vertices = {v for edge in self.graph for v in edge}
+        valid_vertices = set(self.vertices)
         return all(k in valid_vertices for k in state.kiwis) and all(d in valid_vertices for d in state.dogs)
 
     # ACTIONS
@@ -118,7 +179,56 @@ class KiwisAndDogsProblem(Problem):
                 if v in all_positions:
                     return False
         return True
-    
+
+
+# Random graphs
+##############################################################################
+
+
+def vertex_name(i):
+    """Spreadsheet-style vertex names: A, B, ..., Z, AA, AB, ..."""
+    name = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        name = chr(ord("A") + r) + name
+    return name
+
+
+def vertex_key(name):
+    """Sort key that orders vertex names as they were generated."""
+    return (len(name), name)
+
+
+def random_graph(num_vertices, rng, extra_edges=1.0, cond_prob=0.2, max_cost=9):
+    """Random connected graph in the format of `KiwisAndDogsProblem.graph`.
+
+    A random spanning tree is extended with `extra_edges * num_vertices`
+    more edges. Every edge goes both ways with the same cost and
+    conditions, and carries a `somebody(X)` or `nobody(X)` condition
+    with probability `cond_prob`. Conditions may make some instances
+    unsolvable.
+    """
+    names = [vertex_name(i) for i in range(num_vertices)]
+    edges = set()
+    for i in range(1, num_vertices):
+        edges.add((names[rng.randrange(i)], names[i]))
+    for _ in range(int(extra_edges * num_vertices) if num_vertices > 1 else 0):
+        u, v = rng.sample(names, 2)
+        if (v, u) not in edges:
+            edges.add((u, v))
+
+    graph = {}
+    for u, v in sorted(edges):
+        cond = ""
+        if rng.random() < cond_prob:
+            kind = rng.choice(["somebody", "nobody"])
+            cond = f"{kind}({rng.choice(names)})"
+        cost = rng.randint(1, max_cost)
+        graph[(u, v)] = (cost, cond)
+        graph[(v, u)] = (cost, cond)
+    return graph
+
 
 @KiwisAndDogsProblem.heuristic
 class DistanceToGoalHeuristic(Heuristic):
@@ -126,12 +236,210 @@ class DistanceToGoalHeuristic(Heuristic):
 
     def compute(self, state):
         """Suma de distàncies dels kiwis fins a A i del gos fins a E."""
-        # Distàncies simples basades en lletres (per aproximar)
+        # Distàncies simples basades en l'ordre dels vèrtexs (per aproximar)
         # Només una heurística admissible simple
-        target_kiwi = "A"
-        target_dog = "E"
+        index = self.problem.vertex_index
+        target_kiwi = index[self.problem.kiwi_goal]
+        target_dog = index[self.problem.dog_goal]
 
         # Si vols millorar-la, pots basar-te en el cost del graf real
-        h_kiwis = sum(abs(ord(k) - ord(target_kiwi)) for k in state.kiwis)
-        h_dogs = sum(abs(ord(d) - ord(target_dog)) for d in state.dogs)
+        h_kiwis = sum(abs(index[k] - target_kiwi) for k in state.kiwis)
+        h_dogs = sum(abs(index[d] - target_dog) for d in state.dogs)
         return h_kiwis + h_dogs
+
+
+# Pattern databases
+##############################################################################
+
+
+class PatternDatabase:
+    """Exact goal distances of abstractions of KiwisAndDogsProblem.
+
+    Each pattern is a pair `(kiwi_indices, dog_indices)` selecting the
+    agents kept in the abstraction; the rest are abstracted away. The
+    abstract problem relaxes the edge conditions: `nobody(X)` only looks
+    at the kept agents and `somebody(X)` is assumed to hold whenever some
+    agent has been abstracted away. Every abstract distance is then a
+    lower bound of the real one.
+
+    Each action moves a single agent and only the moves of kept agents are
+    counted, so with `mode="add"` and disjoint patterns the values of the
+    patterns can be added. With `mode="max"` patterns may overlap and the
+    maximum is taken.
+
+    Tables are NumPy arrays indexed by the encoded positions of the kept
+    agents (vertex indices in base `len(vertices)`); unreachable abstract
+    states hold -1. They are saved along with a fingerprint of the graph
+    and goals, so a file is never loaded for a different problem.
+    """
+
+    def __init__(self, problem, patterns, mode="add", tables=None):
+        if mode not in ("add", "max"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.vertices = list(problem.vertices)
+        self.fingerprint = self.problem_fingerprint(problem)
+        self.patterns = [(tuple(k), tuple(d)) for k, d in patterns]
+        self.mode = mode
+        if mode == "add":
+            kiwis = [k for p, _ in self.patterns for k in p]
+            dogs = [d for _, p in self.patterns for d in p]
+            if len(kiwis) != len(set(kiwis)) or len(dogs) != len(set(dogs)):
+                raise ValueError("Additive patterns must be disjoint")
+
+        self._index = {v: i for i, v in enumerate(self.vertices)}
+        if tables is None:
+            tables = [self._build(problem, p) for p in self.patterns]
+        self.tables = tables
+
+    @classmethod
+    def default_patterns(cls, problem):
+        """Disjoint patterns pairing each dog with one kiwi; the remaining
+        kiwis (or dogs) are kept alone."""
+        pairs = list(zip(range(problem.num_kiwis), range(problem.num_dogs)))
+        patterns = [((k,), (d,)) for k, d in pairs]
+        patterns += [((k,), ()) for k in range(len(pairs), problem.num_kiwis)]
+        patterns += [((), (d,)) for d in range(len(pairs), problem.num_dogs)]
+        return patterns
+
+    def compute(self, state):
+        """Heuristic value of `state`: a few table lookups."""
+        values = []
+        for (kiwis, dogs), table in zip(self.patterns, self.tables):
+            positions = [state.kiwis[k] for k in kiwis] + [state.dogs[d] for d in dogs]
+            value = table[self._encode(self._index[v] for v in positions)]
+            if value < 0:
+                return float("inf")
+            values.append(int(value))
+        if not values:
+            return 0
+        return sum(values) if self.mode == "add" else max(values)
+
+    # Serialization
+
+    @staticmethod
+    def problem_fingerprint(problem):
+        return repr((sorted(problem.graph.items()), problem.kiwi_goal, problem.dog_goal))
+
+    @staticmethod
+    def npz_path(path):
+        """`np.savez_compressed` appends `.npz` to paths without it."""
+        path = os.fspath(path)
+        return path if path.endswith(".npz") else path + ".npz"
+
+    def save(self, path):
+        arrays = {f"table_{i}": t for i, t in enumerate(self.tables)}
+        np.savez_compressed(
+            self.npz_path(path),
+            vertices=np.array(self.vertices),
+            fingerprint=np.array(self.fingerprint),
+            mode=np.array(self.mode),
+            kiwis=np.array([len(k) for k, _ in self.patterns], dtype=np.int64),
+            dogs=np.array([len(d) for _, d in self.patterns], dtype=np.int64),
+            members=np.array(
+                [i for k, d in self.patterns for i in k + d], dtype=np.int64
+            ),
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, problem, path):
+        path = cls.npz_path(path)
+        with np.load(path) as data:
+            if (
+                list(data["vertices"]) != list(problem.vertices)
+                or str(data["fingerprint"]) != cls.problem_fingerprint(problem)
+            ):
+                raise ValueError(f"{path} was built for a different problem")
+            members = [int(i) for i in data["members"]]
+            patterns = []
+            for n_kiwis, n_dogs in zip(data["kiwis"], data["dogs"]):
+                agents, members = members[: n_kiwis + n_dogs], members[n_kiwis + n_dogs:]
+                patterns.append((agents[:n_kiwis], agents[n_kiwis:]))
+            tables = [data[f"table_{i}"] for i in range(len(patterns))]
+            return cls(problem, patterns, mode=str(data["mode"]), tables=tables)
+
+    # Construction
+
+    def _encode(self, indices):
+        code = 0
+        for i in indices:
+            code = code * len(self.vertices) + i
+        return code
+
+    def _build(self, problem, pattern):
+        """Backward Dijkstra from the abstract goal over the whole abstract
+        space."""
+        kiwis, dogs = pattern
+        n_kiwis = len(kiwis)
+        size = n_kiwis + len(dogs)
+        relaxed = size < problem.num_kiwis + problem.num_dogs
+
+        # Incoming edges per destination vertex: (src, cost, conditions)
+        incoming = {v: [] for v in self.vertices}
+        for (src, dst), (cost, cond) in problem.graph.items():
+            conds = [c.strip() for c in cond.split(",") if c.strip()]
+            incoming[dst].append((src, cost, conds))
+
+        def holds(conds, positions):
+            for cond in conds:
+                v = cond[cond.index("(") + 1:-1]
+                if cond.startswith("somebody(") and not relaxed and v not in positions:
+                    return False
+                if cond.startswith("nobody(") and v in positions:
+                    return False
+            return True
+
+        table = np.full(len(self.vertices) ** size, -1, dtype=np.int32)
+        goal = (problem.kiwi_goal,) * n_kiwis + (problem.dog_goal,) * len(dogs)
+        counter = itertools.count()
+        queue = [(0, next(counter), goal)]
+        while queue:
+            cost, _, positions = heapq.heappop(queue)
+            code = self._encode(self._index[v] for v in positions)
+            if table[code] >= 0:
+                continue
+            table[code] = cost
+
+            # Predecessors: some kept agent was at `src` and moved here
+            for i, dst in enumerate(positions):
+                for src, c, conds in incoming[dst]:
+                    prev = positions[:i] + (src,) + positions[i + 1:]
+                    if not holds(conds, set(prev)):
+                        continue
+                    if table[self._encode(self._index[v] for v in prev)] < 0:
+                        heapq.heappush(queue, (cost + c, next(counter), prev))
+        return table
+
+
+@KiwisAndDogsProblem.heuristic
+class PatternDatabaseHeuristic(Heuristic):
+    NAME = "pattern_database"
+
+    pdb = None
+
+    def compute(self, state):
+        """Additive pattern database over the default patterns."""
+        if self.pdb is None:
+            self.pdb = self.load_or_build(self.problem)
+        return self.pdb.compute(state)
+
+    @staticmethod
+    def load_or_build(problem):
+        """Load the tables from `problem.pdb_file` when it holds the ones
+        for this problem; otherwise build them (and save them there)."""
+        patterns = [
+            (tuple(k), tuple(d)) for k, d in PatternDatabase.default_patterns(problem)
+        ]
+        path = problem.pdb_file
+        if path and os.path.exists(PatternDatabase.npz_path(path)):
+            try:
+                pdb = PatternDatabase.load(problem, path)
+                if pdb.patterns == patterns and pdb.mode == "add":
+                    return pdb
+            except ValueError:
+                pass
+
+        pdb = PatternDatabase(problem, patterns)
+        if path:
+            pdb.save(path)
+        return pdb
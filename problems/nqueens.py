@@ -124,16 +124,32 @@ class NQueensIterativeRepair(Problem):
             name="n_queens", type=int, default="8", help="Number of queens."
         ),
         ClassParameter(name="seed", type=int, default="123456", help="Random seed."),
+        ClassParameter(
+            name="symmetry",
+            type=int,
+            default="0",
+            help="Detect duplicates modulo board symmetries (0/1).",
+        ),
     ]
 
-    def __init__(self, n_queens: int = 8, seed: int = 123456):
+    def __init__(self, n_queens: int = 8, seed: int = 123456, symmetry: int = 0):
         super().__init__()
         self.n_queens = n_queens
         self.seed = seed
+        self.symmetry = bool(symmetry)
         random.seed(self.seed)
+        # Zobrist table with its own generator so the start state drawn
+        # from the global one does not depend on `symmetry`.
+        rng = random.Random(self.seed)
+        self.zobrist = [
+            [rng.getrandbits(64) for _ in range(n_queens)] for _ in range(n_queens)
+        ]
 
     def get_start_states(self):
-        return [tuple(random.randint(0, self.n_queens - 1) for _ in range(self.n_queens))]
+        start = tuple(random.randint(0, self.n_queens - 1) for _ in range(self.n_queens))
+        if self.symmetry:
+            return [Board(start, self.symmetric_hashes(start))]
+        return [start]
 
 
     def is_goal_state(self, state):
@@ -162,7 +178,111 @@ class NQueensIterativeRepair(Problem):
         cost = abs(old_row - new_row)
         new_state = list(state)
         new_state[column] = new_row
-        return cost, tuple(new_state)
+        if not self.symmetry:
+            return cost, tuple(new_state)
+
+        # Incremental Zobrist update: only one queen changed square in
+        # each of the symmetric images of the board.
+        hashes = state.hashes if isinstance(state, Board) else self.symmetric_hashes(state)
+        hashes = tuple(
+            h
+            ^ self.zobrist[c][r_old]
+            ^ self.zobrist[c][r_new]
+            for h, (c, r_old), (_, r_new) in zip(
+                hashes,
+                self._images(column, old_row),
+                self._images(column, new_row),
+            )
+        )
+        return cost, Board(new_state, hashes)
+
+    # Symmetries
+
+    def _images(self, column, row):
+        """Square (column, row) under each symmetry that keeps queens in
+        their columns: identity, vertical flip, horizontal flip and the
+        180 degree rotation."""
+        last = self.n_queens - 1
+        return (
+            (column, row),
+            (column, last - row),
+            (last - column, row),
+            (last - column, last - row),
+        )
+
+    def symmetric_hashes(self, state):
+        """Zobrist hash of every symmetric image of `state`."""
+        hashes = [0, 0, 0, 0]
+        for column, row in enumerate(state):
+            for i, (c, r) in enumerate(self._images(column, row)):
+                hashes[i] ^= self.zobrist[c][r]
+        return tuple(hashes)
+
+    def canonical_state(self, state):
+        """Key used by graph search for duplicate detection.
+
+        With `symmetry` enabled, all the boards that are images of each
+        other share the same key. Rotations by 90 degrees and the diagonal
+        reflections are left out: they turn columns into rows, so they do
+        not map `move_queen` moves (nor their costs) onto `move_queen`
+        moves, and would break cost optimality.
+        """
+        if not self.symmetry:
+            return state
+        if not isinstance(state, Board):
+            state = Board(state, self.symmetric_hashes(state))
+        return CanonicalBoard(state)
+
+
+class Board(tuple):
+    """Board that carries the Zobrist hashes of its symmetric images.
+
+    It compares and hashes like a plain tuple, so it can be used anywhere
+    a state is expected. Tuple subclasses cannot declare non-empty
+    `__slots__`, so `hashes` lives in the instance `__dict__`.
+    """
+
+    def __new__(cls, rows, hashes):
+        board = super().__new__(cls, rows)
+        board.hashes = hashes
+        return board
+
+    def __getnewargs__(self):
+        # copy/pickle would otherwise call __new__ with the rows only
+        return (tuple(self), self.hashes)
+
+
+class CanonicalBoard:
+    """Symmetry class of a board, for duplicate detection.
+
+    Hashing is O(1) thanks to the incremental Zobrist hashes; the
+    canonical representative is only built when two keys collide.
+    """
+
+    __slots__ = ("board", "_hash", "_rows")
+
+    def __init__(self, board):
+        self.board = board
+        self._hash = min(board.hashes)
+        self._rows = None
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            n = len(self.board)
+            flipped = tuple(n - 1 - r for r in self.board)
+            self._rows = min(
+                tuple(self.board), flipped, self.board[::-1], flipped[::-1]
+            )
+        return self._rows
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, CanonicalBoard):
+            return NotImplemented
+        return self._hash == other._hash and self.rows == other.rows
 
 
 # Heuristic
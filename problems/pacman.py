@@ -187,6 +187,15 @@ class PacmanProblem(Problem):
     def is_valid_state(self, _):
         return True
 
+    def encode_state(self, state):
+        """Compact int for a state: cell index and whether the food is eaten."""
+        (r, c), food = state
+        return (r * self.cols + c) * 2 + (food is None)
+
+    def decode_state(self, code):
+        cell, eaten = divmod(code, 2)
+        return (divmod(cell, self.cols), None if eaten else self.start_state[1])
+
     @action(Categorical(["U", "D", "L", "R"]), cost=1)
     def move(self, state, direction):
         (r, c), food = state